@@ -0,0 +1,208 @@
+"""
+Per-request memory benchmark for large documents.
+
+Compares the previous string-based path (full page bytes + decoded text
++ normalized text + f-string prompt + JSON body) with the document store
+path (streamed download, mmap-backed text, streamed request body).
+Each measurement runs in a fresh interpreter and reports peak Python heap
+(tracemalloc) and peak RSS as JSON.
+
+Usage:
+    python benchmarks/document_memory.py [--pages 60] [--output bench.json]
+"""
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import threading
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+WORDS_PER_PAGE = 500
+PROMPT_HEAD = "Summarize the following research paper.\n\nPaper content:\n"
+PAYLOAD = {"model": "benchmark", "messages": [], "temperature": 0.2}
+
+SCENARIOS = ["url_html", "pdf_upload"]
+IMPLEMENTATIONS = ["baseline", "docstore"]
+
+
+# ----------------------------
+# Synthetic Documents
+# ----------------------------
+
+def page_texts(pages: int):
+    words = ["memory", "mapped", "résumé", "transformer", "attention", "dataset",
+             "evaluation", "baseline", "latency", "throughput", "gradient", "token"]
+    for page in range(pages):
+        yield " ".join(
+            words[(page * 7 + i) % len(words)] for i in range(WORDS_PER_PAGE)
+        ) + f" (page {page + 1}).\n"
+
+
+def html_document(pages: int) -> bytes:
+    body = "".join(f"<p>{text}</p>\n" for text in page_texts(pages))
+    return (
+        "<html><head><meta charset='utf-8'><style>p {}</style></head>"
+        f"<body>{body}<script>var x = 1;</script></body></html>"
+    ).encode("utf-8")
+
+
+def serve(content: bytes) -> str:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/paper.html"
+
+
+# ----------------------------
+# Implementations
+# ----------------------------
+
+def baseline_url(url: str) -> int:
+    import requests
+    from bs4 import BeautifulSoup
+
+    response = requests.get(url, timeout=30)
+    content_type = response.headers.get("Content-Type", "")
+    soup = BeautifulSoup(response.text, "html.parser")
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    text = soup.get_text(separator=" ")
+    paper_text = " ".join(text.split())
+
+    assert content_type and len(paper_text.split()) >= 500
+    return _baseline_body(paper_text)
+
+
+def baseline_upload(pages: int) -> int:
+    text = ""
+    for page in page_texts(pages):
+        text += page
+    return _baseline_body(text.strip())
+
+
+def _baseline_body(document: str) -> int:
+    prompt = f"{PROMPT_HEAD}{document}\n"
+    payload = {**PAYLOAD, "messages": [{"role": "user", "content": prompt}]}
+    # What requests does for json=payload
+    body = json.dumps(payload).encode("utf-8")
+    return len(body)
+
+
+def docstore_url(url: str) -> int:
+    from interactive_assistant.backend import fetch_url_content
+
+    with fetch_url_content(url) as paper:
+        assert paper.word_count >= 500
+        return _streamed_body(paper)
+
+
+def docstore_upload(pages: int) -> int:
+    from interactive_assistant.docstore import spill_text
+
+    with spill_text(page_texts(pages)) as document:
+        return _streamed_body(document)
+
+
+def _streamed_body(document) -> int:
+    from interactive_assistant.docstore import iter_document_text
+    from multiagent_system.llm import CONTENT_PLACEHOLDER, _stream_body
+
+    payload = {**PAYLOAD, "messages": [{"role": "user", "content": CONTENT_PLACEHOLDER}]}
+    chunks = itertools.chain([PROMPT_HEAD], iter_document_text(document), ["\n"])
+    # Consume the body the way the HTTP adapter would, chunk by chunk
+    return sum(len(part) for part in _stream_body(payload, chunks))
+
+
+# ----------------------------
+# Runner
+# ----------------------------
+
+def run_child(scenario: str, impl: str, pages: int) -> dict:
+    import resource
+
+    url = serve(html_document(pages)) if scenario == "url_html" else None
+
+    # Warm up imports so only per-request allocations are measured
+    import requests  # noqa: F401
+    import bs4  # noqa: F401
+    import interactive_assistant.backend  # noqa: F401
+    import multiagent_system.llm  # noqa: F401
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+
+    if scenario == "url_html":
+        body_bytes = baseline_url(url) if impl == "baseline" else docstore_url(url)
+    else:
+        body_bytes = baseline_upload(pages) if impl == "baseline" else docstore_upload(pages)
+
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "body_bytes": body_bytes,
+        "peak_heap_kb": peak // 1024,
+        "rss_growth_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--child", nargs=2, metavar=("SCENARIO", "IMPL"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child[0], args.child[1], args.pages)))
+        return
+
+    report = {"pages": args.pages, "scenarios": {}}
+
+    for scenario in SCENARIOS:
+        results = {}
+        for impl in IMPLEMENTATIONS:
+            completed = subprocess.run(
+                [sys.executable, __file__, "--pages", str(args.pages), "--child", scenario, impl],
+                capture_output=True,
+                text=True
+            )
+            if completed.returncode != 0:
+                results[impl] = {"error": completed.stderr.strip().splitlines()[-1]}
+            else:
+                results[impl] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+        baseline, docstore = results["baseline"], results["docstore"]
+        if "error" not in baseline and "error" not in docstore:
+            results["peak_heap_reduction"] = round(
+                1 - docstore["peak_heap_kb"] / max(baseline["peak_heap_kb"], 1), 3
+            )
+        report["scenarios"][scenario] = results
+
+    text = json.dumps(report, indent=2)
+    print(text)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
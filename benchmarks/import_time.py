@@ -0,0 +1,94 @@
+"""
+Import-time benchmark for the entry points.
+
+Imports each module in a fresh interpreter and records wall-clock import
+time and peak RSS. Results are printed as JSON so runs can be compared
+across changes.
+
+Usage:
+    python benchmarks/import_time.py [--repeat 5] [--output bench.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+ENTRY_MODULES = [
+    "interactive_assistant.backend",
+    "multiagent_system.graph",
+    "mini_research_agent.mini_research_agent"
+]
+
+# Heavy dependencies that should stay unloaded after a cold import
+LAZY_MODULES = [
+    "langgraph",
+    "tavily",
+    "bs4",
+    "pdfminer",
+    "pypdf",
+    "numpy"
+]
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "import_s": elapsed,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "loaded": [m for m in {lazy!r} if m in sys.modules]
+}}))
+"""
+
+
+def measure(module: str, repeat: int) -> dict:
+    runs = []
+
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, lazy=LAZY_MODULES)],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True
+        )
+
+        if completed.returncode != 0:
+            return {"error": completed.stderr.strip().splitlines()[-1]}
+
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    return {
+        "import_s_median": statistics.median(r["import_s"] for r in runs),
+        "import_s_min": min(r["import_s"] for r in runs),
+        "max_rss_kb_median": statistics.median(r["max_rss_kb"] for r in runs),
+        "heavy_modules_loaded": runs[-1]["loaded"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = {
+        "python": sys.version.split()[0],
+        "repeat": args.repeat,
+        "modules": {module: measure(module, args.repeat) for module in ENTRY_MODULES}
+    }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
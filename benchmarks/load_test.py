@@ -0,0 +1,468 @@
+"""
+Load and soak test for the interactive assistant router.
+
+Replays a workload mix (research topics, paper URLs, uploaded PDFs,
+grounded follow-ups and general questions) against `route_user_input`
+with open-loop Poisson arrivals and a concurrency cap. The LLM, search
+and paper web servers are replaced by local mock servers. There is no
+HTTP service in front of the router, so requests call it in-process,
+either directly or through the background job queue (--via jobs).
+
+Reports throughput, latency percentiles and error rates per route
+branch, and RSS growth over the run, as JSON.
+
+Usage:
+    python benchmarks/load_test.py --duration 60 --rate 20 --concurrency 32
+    python benchmarks/load_test.py --duration 1800 --rate 5 --output soak.json
+    python benchmarks/load_test.py --workload recorded.jsonl
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import resource
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from document_memory import html_document, page_texts  # noqa: E402
+
+BRANCHES = ["topic", "url", "pdf", "followup", "general"]
+DEFAULT_MIX = "topic=0.25,url=0.15,pdf=0.1,followup=0.35,general=0.15"
+
+TOPICS = [
+    "impact of large language models on education",
+    "analysis of solar energy storage methods",
+    "survey of graph neural network approaches",
+    "effect of sleep on memory consolidation",
+    "review of federated learning frameworks"
+]
+FOLLOWUPS = [
+    "What are the main challenges mentioned?",
+    "Which methods performed best?",
+    "What datasets were used?"
+]
+QUESTIONS = [
+    "How does a transformer work?",
+    "What is the capital of Australia?",
+    "Explain gradient descent briefly."
+]
+
+PAPER_PAGES = 20
+PDF_PAGES = 40
+
+
+# ----------------------------
+# Mock Servers
+# ----------------------------
+
+class MockHandler(BaseHTTPRequestHandler):
+    """
+    One local server standing in for OpenRouter (/chat/completions),
+    Tavily (/search) and paper web pages (/paper/<n>.html).
+    """
+
+    protocol_version = "HTTP/1.1"
+    llm_latency_s = 0.0
+    search_latency_s = 0.0
+    paper_html = b""
+
+    def log_message(self, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            parts = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                parts.append(self.rfile.read(size))
+                self.rfile.readline()
+            return b"".join(parts)
+
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _jittered(self, latency_s: float) -> None:
+        if latency_s:
+            time.sleep(random.uniform(0.5, 1.5) * latency_s)
+
+    def do_POST(self):
+        payload = json.loads(self._read_body() or b"{}")
+
+        if self.path.endswith("/chat/completions"):
+            self._jittered(self.llm_latency_s)
+            prompt = payload["messages"][-1]["content"]
+
+            if "research planner" in prompt:
+                count = int(re.search(r"Exactly (\d+)", prompt).group(1)) if "Exactly" in prompt else 2
+                content = json.dumps({
+                    "sub_questions": [f"What is known about aspect {i} of this topic?" for i in range(count)],
+                    "output_format": "Short academic summary"
+                })
+            else:
+                content = "Mock summary of the findings [1][2]. " * 20
+
+            body = json.dumps({"choices": [{"message": {"content": content}}]})
+            self._send(200, body.encode(), "application/json")
+
+        elif self.path.endswith("/search"):
+            self._jittered(self.search_latency_s)
+            query = payload.get("query", "")
+            results = [
+                {
+                    "url": f"http://{self.headers['Host']}/source/{abs(hash((query, i))) % 10000}",
+                    "title": f"Source {i} for {query}",
+                    "score": 0.9 - i * 0.1,
+                    "content": " ".join(
+                        f"{query} finding {i}-{j} with evidence {random.random():.6f}."
+                        for j in range(12)
+                    )
+                }
+                for i in range(payload.get("max_results") or 3)
+            ]
+            body = json.dumps({"query": query, "results": results})
+            self._send(200, body.encode(), "application/json")
+
+        else:
+            self._send(404, b"{}", "application/json")
+
+    def do_GET(self):
+        if self.path.startswith("/paper/"):
+            self._send(200, self.paper_html, "text/html; charset=utf-8")
+        else:
+            self._send(404, b"not found", "text/plain")
+
+
+def start_mock_server(llm_latency_s: float, search_latency_s: float) -> str:
+    MockHandler.llm_latency_s = llm_latency_s
+    MockHandler.search_latency_s = search_latency_s
+    MockHandler.paper_html = html_document(PAPER_PAGES)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# ----------------------------
+# Workload
+# ----------------------------
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for item in text.split(","):
+        name, weight = item.split("=")
+        if name not in BRANCHES:
+            raise ValueError(f"Unknown branch in mix: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+def make_request(kind: str, n: int, base_url: str, rng: random.Random) -> dict:
+    if kind == "topic":
+        return {"kind": kind, "input": rng.choice(TOPICS)}
+    if kind == "url":
+        return {"kind": kind, "input": f"{base_url}/paper/{n}.html"}
+    if kind == "pdf":
+        return {"kind": kind, "input": "Summarize this paper", "pdf_pages": PDF_PAGES}
+    if kind == "followup":
+        return {"kind": kind, "input": rng.choice(FOLLOWUPS)}
+    return {"kind": kind, "input": rng.choice(QUESTIONS)}
+
+
+def synthetic_workload(mix: dict, base_url: str, rng: random.Random):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    n = 0
+
+    while True:
+        n += 1
+        yield make_request(rng.choices(names, weights)[0], n, base_url, rng)
+
+
+def recorded_workload(path: str, base_url: str):
+    """
+    Replays a JSONL file of {"kind", "input", ...} records in a loop.
+    "{base_url}" in an input is replaced with the mock server address.
+    """
+    with open(path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+
+    while True:
+        for record in records:
+            yield {**record, "input": record["input"].replace("{base_url}", base_url)}
+
+
+# ----------------------------
+# Request Execution
+# ----------------------------
+
+def make_session(kind: str) -> dict:
+    session = {"summary_length": "Short"}
+    if kind == "followup":
+        session["research_context"] = "Mock research summary about the topic. " * 30
+        session["source_type"] = "topic"
+    return session
+
+
+def execute(request: dict, via: str) -> str:
+    from interactive_assistant.backend import route_user_input, submit_user_input
+    from interactive_assistant.docstore import spill_text
+
+    kind = request["kind"]
+    session = make_session(kind)
+    mode = "General Assistant" if kind == "general" else "Research Assistant"
+
+    pdf_text = None
+    if kind == "pdf":
+        pdf_text = spill_text(page_texts(request.get("pdf_pages", PDF_PAGES)))
+
+    try:
+        if via == "jobs":
+            job = submit_user_input(request["input"], session, pdf_text, mode)
+            if job is not None:
+                job.wait()
+                if job.error is not None:
+                    raise job.error
+                if job.result is None:
+                    raise RuntimeError(f"Job {job.status}")
+                return job.result["response"]
+
+        return route_user_input(request["input"], session, pdf_text, mode)
+    finally:
+        if pdf_text is not None:
+            pdf_text.close()
+
+
+# ----------------------------
+# Memory Sampling
+# ----------------------------
+
+def current_rss_kb() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def sample_memory(samples: list, started: float, interval_s: float, stop: threading.Event) -> None:
+    while not stop.is_set():
+        samples.append((round(time.monotonic() - started, 2), current_rss_kb()))
+        stop.wait(interval_s)
+
+
+def memory_report(samples: list) -> dict:
+    if not samples:
+        return {}
+
+    times = [t for t, _ in samples]
+    values = [v for _, v in samples]
+
+    slope = 0.0
+    if len(samples) > 1 and max(times) > min(times):
+        mean_t, mean_v = statistics.fmean(times), statistics.fmean(values)
+        slope = sum((t - mean_t) * (v - mean_v) for t, v in samples) / sum(
+            (t - mean_t) ** 2 for t in times
+        )
+
+    return {
+        "start_kb": values[0],
+        "end_kb": values[-1],
+        "peak_kb": max(values),
+        "growth_kb": values[-1] - values[0],
+        "slope_kb_per_min": round(slope * 60, 1),
+        "samples": samples
+    }
+
+
+# ----------------------------
+# Reporting
+# ----------------------------
+
+def percentile(sorted_values: list, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(p / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def branch_report(records: list) -> dict:
+    latencies = sorted(r["latency_s"] for r in records)
+    errors = sum(1 for r in records if r["error"])
+
+    return {
+        "requests": len(records),
+        "errors": errors,
+        "error_rate": round(errors / len(records), 4) if records else 0.0,
+        "latency_s": {
+            "mean": round(statistics.fmean(latencies), 4) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 4),
+            "p90": round(percentile(latencies, 90), 4),
+            "p95": round(percentile(latencies, 95), 4),
+            "p99": round(percentile(latencies, 99), 4),
+            "max": round(latencies[-1], 4) if latencies else 0.0
+        }
+    }
+
+
+# ----------------------------
+# Runner
+# ----------------------------
+
+def run(args) -> dict:
+    base_url = start_mock_server(args.llm_latency_ms / 1000, args.search_latency_ms / 1000)
+
+    # Point the app at the mocks before its modules read the settings
+    os.environ["OPENROUTER_URL"] = f"{base_url}/chat/completions"
+    os.environ["TAVILY_API_BASE_URL"] = base_url
+    os.environ.setdefault("OPENROUTER_API_KEY", "load-test")
+    os.environ.setdefault("TAVILY_API_KEY", "load-test")
+    logging.getLogger("urllib3").setLevel(logging.ERROR)
+
+    import interactive_assistant.backend  # noqa: F401
+
+    rng = random.Random(args.seed)
+
+    # One request per branch first, so lazy imports, compiled graphs and
+    # connection pools are not counted as memory growth
+    if args.warmup:
+        for kind in BRANCHES:
+            execute(make_request(kind, 0, base_url, random.Random()), args.via)
+
+    if args.workload:
+        workload = recorded_workload(args.workload, base_url)
+    else:
+        workload = synthetic_workload(parse_mix(args.mix), base_url, rng)
+
+    records = []
+    records_lock = threading.Lock()
+    samples = []
+    stop_sampling = threading.Event()
+    slots = threading.BoundedSemaphore(args.concurrency)
+
+    def handle(request: dict, arrived: float) -> None:
+        error = None
+        try:
+            response = execute(request, args.via)
+            if response.startswith(("❌", "⚠️")):
+                error = response.splitlines()[0][:200]
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"[:200]
+        finally:
+            slots.release()
+
+        with records_lock:
+            records.append({
+                "kind": request["kind"],
+                "latency_s": time.monotonic() - arrived,
+                "error": error
+            })
+
+    started = time.monotonic()
+    sampler = threading.Thread(
+        target=sample_memory,
+        args=(samples, started, args.sample_interval, stop_sampling),
+        daemon=True
+    )
+    sampler.start()
+
+    issued = 0
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        next_arrival = started
+        while next_arrival - started < args.duration:
+            time.sleep(max(next_arrival - time.monotonic(), 0))
+            request = next(workload)
+
+            # Latency counts from the scheduled arrival, so time spent
+            # waiting for a free concurrency slot shows up in the results.
+            slots.acquire()
+            pool.submit(handle, request, next_arrival)
+            issued += 1
+
+            next_arrival += rng.expovariate(args.rate)
+
+    elapsed = time.monotonic() - started
+    stop_sampling.set()
+    sampler.join()
+
+    by_branch = {}
+    for record in records:
+        by_branch.setdefault(record["kind"], []).append(record)
+
+    errors = sum(1 for r in records if r["error"])
+    error_samples = sorted({r["error"] for r in records if r["error"]})[:10]
+
+    return {
+        "config": {
+            "duration_s": args.duration,
+            "rate_per_s": args.rate,
+            "concurrency": args.concurrency,
+            "via": args.via,
+            "workload": args.workload or args.mix,
+            "llm_latency_ms": args.llm_latency_ms,
+            "search_latency_ms": args.search_latency_ms,
+            "seed": args.seed
+        },
+        "totals": {
+            "issued": issued,
+            "completed": len(records),
+            "errors": errors,
+            "error_rate": round(errors / len(records), 4) if records else 0.0,
+            "elapsed_s": round(elapsed, 2),
+            "throughput_per_s": round(len(records) / elapsed, 2) if elapsed else 0.0
+        },
+        "branches": {kind: branch_report(by_branch[kind]) for kind in sorted(by_branch)},
+        "error_samples": error_samples,
+        "memory": memory_report(samples)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to keep issuing requests")
+    parser.add_argument("--rate", type=float, default=10, help="Mean arrivals per second (Poisson)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Maximum requests in flight")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Synthetic branch weights")
+    parser.add_argument("--workload", help="JSONL file of recorded requests to replay")
+    parser.add_argument("--via", choices=["router", "jobs"], default="router")
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    parser.add_argument("--search-latency-ms", type=float, default=100)
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Seconds between RSS samples")
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false",
+                        help="Skip the warm-up request per branch")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    report = run(args)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
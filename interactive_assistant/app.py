@@ -2,7 +2,6 @@ import sys
 import os
 import uuid
 import streamlit as st
-from pypdf import PdfReader
 
 # -------------------------------------------------
 # Add project root to PYTHONPATH
@@ -11,17 +10,54 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-from backend import route_user_input
+from backend import route_user_input, submit_user_input
+from interactive_assistant.jobs import DONE, EXPIRED, JobQueueFull
+
+POLL_INTERVAL_S = 0.5
 
 # -------------------------------------------------
-# Utility: Extract PDF Text
+# Utility: Wait for a Background Job
 # -------------------------------------------------
-def extract_pdf_text(uploaded_file) -> str:
-    reader = PdfReader(uploaded_file)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() or ""
-    return text.strip()
+def render_pending_job(chat) -> None:
+    """
+    Polls the chat's background job, showing its progress, and records
+    the response once it finishes. If the user interacts meanwhile,
+    Streamlit reruns the script and polling resumes on the next run.
+    Cancel detaches the chat right away; the job itself only stops if
+    no other chat is waiting on it.
+    """
+    job = chat["pending_job"]
+
+    with st.chat_message("assistant"):
+        if st.button("Cancel", key=f"cancel_{job.id}"):
+            job.cancel()
+            response = "Request cancelled."
+            st.markdown(response)
+            chat["messages"].append(
+                {"role": "assistant", "content": response}
+            )
+            chat["pending_job"] = None
+            return
+
+        status = st.empty()
+        while not job.wait(POLL_INTERVAL_S):
+            status.markdown(f"⏳ {job.latest_progress or 'Queued'}...")
+        status.empty()
+
+        if job.status == DONE:
+            response = job.result["response"]
+            chat.update(job.result["session_updates"])
+        elif job.status == EXPIRED:
+            response = "⚠️ The request took too long and was stopped. Please try again."
+        else:
+            response = f"❌ Request failed: {job.error}"
+
+        st.markdown(response)
+
+    chat["messages"].append(
+        {"role": "assistant", "content": response}
+    )
+    chat["pending_job"] = None
 
 # -------------------------------------------------
 # Page Configuration
@@ -48,7 +84,8 @@ if "chats" not in st.session_state:
             "messages": [],
             "research_context": None,
             "source_type": None,
-            "summary_length": "Short"
+            "summary_length": "Short",
+            "pending_job": None
         }
     }
     st.session_state.active_chat_id = first_chat_id
@@ -77,7 +114,8 @@ with st.sidebar:
                 "messages": [],
                 "research_context": None,
                 "source_type": None,
-                "summary_length": "Short"
+                "summary_length": "Short",
+                "pending_job": None
             }
             st.session_state.active_chat_id = new_id
             st.session_state.rename_chat_id = None
@@ -141,7 +179,8 @@ with st.sidebar:
                             "messages": [],
                             "research_context": None,
                             "source_type": None,
-                            "summary_length": "Short"
+                            "summary_length": "Short",
+                            "pending_job": None
                         }
                         st.session_state.active_chat_id = new_id
 
@@ -179,14 +218,19 @@ for message in active_chat["messages"]:
 # -------------------------------------------------
 # User Input
 # -------------------------------------------------
+# Disabled while a background job is pending, so replies stay in order
+# and follow-ups see the research context the job returns.
 user_input = st.chat_input(
-    "Ask a research topic, upload a paper, paste a paper URL, or ask a question..."
+    "Ask a research topic, upload a paper, paste a paper URL, or ask a question...",
+    disabled=active_chat.get("pending_job") is not None
 )
 
 if user_input is not None:
     user_input = user_input.strip()
 
-    if not user_input:
+    if active_chat.get("pending_job") is not None:
+        st.info("ℹ️ Please wait for the current request to finish.")
+    elif not user_input:
         st.info(
             "ℹ️ Please enter a research topic, a general question, "
             "upload a PDF, or paste a research paper URL to continue."
@@ -199,21 +243,51 @@ if user_input is not None:
         with st.chat_message("user"):
             st.markdown(user_input)
 
-        pdf_text = extract_pdf_text(uploaded_pdf) if uploaded_pdf else None
-
-        with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                response = route_user_input(
-                    user_input=user_input,
-                    session=active_chat,
-                    pdf_text=pdf_text,
-                    mode=assistant_mode
-                )
-                st.markdown(response)
-
-        active_chat["messages"].append(
-            {"role": "assistant", "content": response}
-        )
+        # Long summaries and research run on the background job queue;
+        # quick chat replies run inline. An uploaded PDF is extracted
+        # inside the job, and only for requests that summarize it.
+        try:
+            job = submit_user_input(
+                user_input=user_input,
+                session=active_chat,
+                mode=assistant_mode,
+                pdf_upload=uploaded_pdf.getvalue() if uploaded_pdf else None
+            )
+            busy = False
+        except JobQueueFull:
+            job = None
+            busy = True
 
         if active_chat["title"] == "New Chat":
             active_chat["title"] = user_input[:40]
+
+        if job is not None:
+            # Rerun so the chat input renders disabled while the job runs
+            active_chat["pending_job"] = job
+            st.rerun()
+        else:
+            with st.chat_message("assistant"):
+                with st.spinner("Thinking..."):
+                    if busy:
+                        response = (
+                            "⚠️ The assistant is busy with other research requests. "
+                            "Please try again in a moment."
+                        )
+                    else:
+                        response = route_user_input(
+                            user_input=user_input,
+                            session=active_chat,
+                            mode=assistant_mode
+                        )
+                    st.markdown(response)
+
+            active_chat["messages"].append(
+                {"role": "assistant", "content": response}
+            )
+
+# -------------------------------------------------
+# Background Job Progress
+# -------------------------------------------------
+if active_chat.get("pending_job") is not None:
+    render_pending_job(active_chat)
+    st.rerun()
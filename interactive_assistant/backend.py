@@ -1,22 +1,41 @@
+import io
 import re
-import os
+import hashlib
+import itertools
 import requests
 import tempfile
-from typing import Dict, Optional
-
-from multiagent_system.graph import build_graph
-
-from bs4 import BeautifulSoup
-from pdfminer.high_level import extract_text
+from functools import lru_cache
+from typing import Dict, Optional, Union
+
+from interactive_assistant.docstore import (
+    DocumentHandle,
+    DocumentWriter,
+    document_digest,
+    iter_document_text
+)
+from interactive_assistant.jobs import (
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    Job,
+    JobCancelled,
+    JobHandle,
+    get_job_queue,
+    report_progress
+)
+from multiagent_system.llm import chat_completion, chat_completion_from_chunks
+
+# LangGraph, BeautifulSoup, pdfminer and pypdf are imported on first use so
+# General Assistant chats and Streamlit reruns do not pay for them.
 
 # ----------------------------
 # Configuration
 # ----------------------------
 
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
 MODEL_ID = "amazon/nova-lite-v1"
 
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+MIN_PAPER_WORDS = 500
+
 SUMMARY_WORD_LIMITS = {
     "Short": "250-300 words",
     "Long": "600-800 words"
@@ -27,71 +46,135 @@ ANSWER_WORD_LIMITS = {
     "Long": "300-500 words"
 }
 
+RESEARCH_SUMMARY_STYLE = """
+STRUCTURE REQUIREMENTS:
+- Well-structured academic sections
+- Multiple paragraphs allowed
+- No bullet points
+- Formal academic tone
+
+CONTENT REQUIREMENTS:
+- Synthesize findings from multiple research papers
+- Do NOT fabricate claims or statistics
+"""
+
+# ----------------------------
+# Research Graph
+# ----------------------------
+
+@lru_cache(maxsize=1)
+def get_research_graph():
+    """
+    Compiles the multi-agent research graph once, on first use.
+    """
+    from multiagent_system.graph import build_graph
+
+    return build_graph()
+
+
+GRAPH_NODE_PROGRESS = {
+    "planner": "Planned research sub-questions",
+    "searcher": "Searched sources",
+    "evaluator": "Checked source coverage",
+    "writer": "Wrote summary"
+}
+
+
+def run_research_graph(state: Dict) -> Dict:
+    """
+    Runs the research graph node by node, reporting each finished node
+    as job progress (and stopping if the job was cancelled).
+    """
+    final_state = state
+
+    for update in get_research_graph().stream(state, stream_mode="updates"):
+        for node, node_state in update.items():
+            final_state = node_state
+            report_progress(GRAPH_NODE_PROGRESS.get(node, node))
+
+    return final_state
+
+
 # ----------------------------
 # URL Content Extraction
 # ----------------------------
 
-def fetch_url_content(url: str) -> str:
+def fetch_url_content(url: str) -> DocumentHandle:
     """
     Fetches text content from a research paper URL.
     Supports both PDF and HTML pages.
+
+    The download is streamed to a temporary file and the extracted text
+    is spilled to a memory-mapped document, so the page is never held
+    in memory as both bytes and decoded strings.
     """
     url = url.strip()
 
-    response = requests.get(url, timeout=30)
-    response.raise_for_status()
+    with requests.get(url, timeout=30, stream=True) as response:
+        response.raise_for_status()
 
-    content_type = response.headers.get("Content-Type", "").lower()
+        content_type = response.headers.get("Content-Type", "").lower()
 
-    # ---- PDF ----
-    if "application/pdf" in content_type or url.lower().endswith(".pdf"):
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(response.content)
-            tmp_path = tmp.name
+        with tempfile.TemporaryFile() as raw:
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_BYTES):
+                raw.write(chunk)
+            raw.seek(0)
 
-        text = extract_text(tmp_path)
-        return text.strip()
+            writer = DocumentWriter()
+            try:
+                # ---- PDF ----
+                if "application/pdf" in content_type or url.lower().endswith(".pdf"):
+                    from pdfminer.high_level import extract_text_to_fp
+                    from pdfminer.layout import LAParams
 
-    # ---- HTML ----
-    soup = BeautifulSoup(response.text, "html.parser")
+                    extract_text_to_fp(raw, writer, laparams=LAParams())
 
-    for tag in soup(["script", "style", "noscript"]):
-        tag.decompose()
+                # ---- HTML ----
+                else:
+                    from bs4 import BeautifulSoup
 
-    text = soup.get_text(separator=" ")
-    return " ".join(text.split())
+                    encoding = response.encoding if "charset=" in content_type else None
+                    soup = BeautifulSoup(raw, "html.parser", from_encoding=encoding)
 
+                    for tag in soup(["script", "style", "noscript"]):
+                        tag.decompose()
 
-# ----------------------------
-# Prompt Builders
-# ----------------------------
+                    separator = ""
+                    for piece in soup.stripped_strings:
+                        writer.write(separator + " ".join(piece.split()))
+                        separator = " "
+            except BaseException:
+                writer.abort()
+                raise
 
-def research_summary_prompt(topic: str, summary_length: str) -> str:
-    return f"""
-You are a research assistant.
+            return writer.finish()
 
-Write a {summary_length.lower()} academic research summary
-({SUMMARY_WORD_LIMITS[summary_length]}) on the topic below.
 
-STRUCTURE REQUIREMENTS:
-- Well-structured academic sections
-- Multiple paragraphs allowed
-- No bullet points
-- Formal academic tone
+# ----------------------------
+# PDF Upload Extraction
+# ----------------------------
 
-CONTENT REQUIREMENTS:
-- Synthesize findings from multiple research papers
-- Do NOT fabricate claims or statistics
+def extract_pdf_text(data: bytes) -> DocumentHandle:
+    """
+    Extracts the text of an uploaded PDF page by page into a document.
+    Runs inside the background job, not the Streamlit script thread.
+    """
+    from pypdf import PdfReader
 
-REFERENCES (MANDATORY):
-- Include a final section titled "References"
-- Each reference must include a clickable URL
-- If unavailable, state "References not available"
+    reader = PdfReader(io.BytesIO(data))
+    writer = DocumentWriter()
+    try:
+        for page in reader.pages:
+            writer.write(page.extract_text() or "")
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.finish()
 
-Research Topic:
-{topic}
-"""
 
+# ----------------------------
+# Prompt Builders
+# ----------------------------
 
 def grounded_answer_prompt(context: str, question: str, summary_length: str) -> str:
     return f"""
@@ -162,20 +245,32 @@ def is_system_methodology_question(text: str) -> bool:
 # ----------------------------
 
 def call_llm(prompt: str, temperature: float = 0.2) -> str:
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "Content-Type": "application/json"
-    }
-
-    payload = {
-        "model": MODEL_ID,
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": temperature
-    }
-
-    response = requests.post(OPENROUTER_URL, headers=headers, json=payload)
-    response.raise_for_status()
-    return response.json()["choices"][0]["message"]["content"]
+    return chat_completion(
+        [{"role": "user", "content": prompt}],
+        model=MODEL_ID,
+        temperature=temperature,
+        title="Research Assistant",
+        caller="research assistant"
+    )
+
+
+def call_llm_with_document(
+    prompt_head: str,
+    document: Union[str, DocumentHandle],
+    prompt_tail: str = "\n",
+    temperature: float = 0.2
+) -> str:
+    """
+    Sends a prompt with a document embedded, streaming the document's
+    text into the request body instead of building one prompt string.
+    """
+    return chat_completion_from_chunks(
+        itertools.chain([prompt_head], iter_document_text(document), [prompt_tail]),
+        model=MODEL_ID,
+        temperature=temperature,
+        title="Research Assistant",
+        caller="research assistant"
+    )
 
 
 # ----------------------------
@@ -185,7 +280,7 @@ def call_llm(prompt: str, temperature: float = 0.2) -> str:
 def route_user_input(
     user_input: str,
     session: Dict,
-    pdf_text: Optional[str] = None,
+    pdf_text: Optional[Union[str, DocumentHandle]] = None,
     mode: str = "Research Assistant"
 ) -> str:
     """
@@ -232,6 +327,7 @@ Question:
     # PDF-based summarization
     # ----------------------------
     if pdf_text:
+        report_progress("Summarizing uploaded paper")
         prompt = f"""
 Summarize the following research paper in a well-structured,
 clear, and concise academic manner.
@@ -244,9 +340,8 @@ MANDATORY REQUIREMENTS:
 Summary length: {summary_length}
 
 Paper content:
-{pdf_text}
 """
-        summary = call_llm(prompt)
+        summary = call_llm_with_document(prompt, pdf_text)
         session["research_context"] = summary
         session["source_type"] = "pdf"
         return summary
@@ -256,15 +351,15 @@ Paper content:
     # ----------------------------
     if is_url(user_input):
         try:
-            paper_text = fetch_url_content(user_input)
-
-            if not paper_text or len(paper_text.split()) < 500:
-                return (
-                    "⚠️ Unable to extract sufficient academic content from the URL. "
-                    "Please upload the PDF version for accurate summarization."
-                )
-
-            prompt = f"""
+            report_progress("Fetching URL content")
+            with fetch_url_content(user_input) as paper:
+                if paper.word_count < MIN_PAPER_WORDS:
+                    return (
+                        "⚠️ Unable to extract sufficient academic content from the URL. "
+                        "Please upload the PDF version for accurate summarization."
+                    )
+
+                prompt = f"""
 Summarize the following research paper in a well-structured,
 clear, and concise academic manner.
 
@@ -277,22 +372,29 @@ MANDATORY REQUIREMENTS:
 Summary length: {summary_length}
 
 Paper content:
-{paper_text}
 """
-            summary = call_llm(prompt)
+                report_progress("Summarizing paper")
+                summary = call_llm_with_document(prompt, paper)
+
             session["research_context"] = summary
             session["source_type"] = "url"
             return summary
 
+        except JobCancelled:
+            raise
         except Exception as e:
             return f"❌ Failed to process the URL: {str(e)}"
 
     # ----------------------------
-    # Research topic summarization
+    # Research topic summarization (multi-agent, cited sources)
     # ----------------------------
     if looks_like_research_topic(user_input):
-        prompt = research_summary_prompt(user_input, summary_length)
-        summary = call_llm(prompt)
+        result = run_research_graph({
+            "topic": user_input,
+            "summary_words": SUMMARY_WORD_LIMITS[summary_length],
+            "summary_style": RESEARCH_SUMMARY_STYLE
+        })
+        summary = result["final_summary"]
         session["research_context"] = summary
         session["source_type"] = "topic"
         return summary
@@ -307,3 +409,98 @@ Question:
 {user_input}
 """
     return call_llm(prompt, temperature=0.1)
+
+
+# ----------------------------
+# Background Jobs
+# ----------------------------
+
+HEAVY_JOB_PRIORITY = {
+    "pdf": PRIORITY_NORMAL,
+    "url": PRIORITY_NORMAL,
+    "topic": PRIORITY_LOW
+}
+
+
+def heavy_request_kind(
+    user_input: str,
+    session: Dict,
+    pdf_text: Optional[Union[str, DocumentHandle]] = None,
+    mode: str = "Research Assistant"
+) -> Optional[str]:
+    """
+    Returns the long-running branch route_user_input would take
+    ("pdf", "url" or "topic"), or None for quick chat replies.
+    """
+    if mode == "General Assistant":
+        return None
+
+    if is_system_methodology_question(user_input) or session.get("research_context"):
+        return None
+
+    if pdf_text:
+        return "pdf"
+
+    if is_url(user_input):
+        return "url"
+
+    if looks_like_research_topic(user_input):
+        return "topic"
+
+    return None
+
+
+def submit_user_input(
+    user_input: str,
+    session: Dict,
+    pdf_text: Optional[Union[str, DocumentHandle]] = None,
+    mode: str = "Research Assistant",
+    pdf_upload: Optional[bytes] = None
+) -> Optional[JobHandle]:
+    """
+    Submits long summarization and research requests to the background
+    job queue. Returns None for quick replies, which should run inline.
+    - pdf_text: an already extracted document
+    - pdf_upload: raw PDF bytes, extracted inside the job and only when
+      the request takes the PDF branch
+
+    The job result is a dict with the response and the session updates
+    to apply once it finishes; the job itself never touches `session`,
+    so identical requests from different chats can share one job.
+    """
+    kind = heavy_request_kind(user_input, session, pdf_text or pdf_upload, mode)
+    if kind is None:
+        return None
+
+    if kind != "pdf":
+        pdf_text = pdf_upload = None
+
+    if pdf_upload is not None:
+        document_key = hashlib.sha256(pdf_upload).hexdigest()
+    else:
+        document_key = document_digest(pdf_text)
+
+    summary_length = session.get("summary_length", "Short")
+    key = hashlib.sha256(
+        "\0".join([kind, mode, summary_length, user_input.strip(), document_key]).encode()
+    ).hexdigest()
+
+    def run(job: Job) -> Dict:
+        scratch = {"summary_length": summary_length}
+
+        if pdf_upload is not None:
+            report_progress("Reading uploaded paper")
+            with extract_pdf_text(pdf_upload) as document:
+                response = route_user_input(user_input, scratch, document, mode)
+        else:
+            response = route_user_input(user_input, scratch, pdf_text, mode)
+
+        return {
+            "response": response,
+            "session_updates": {
+                k: scratch[k] for k in ("research_context", "source_type")
+                if k in scratch
+            }
+        }
+
+    return get_job_queue().submit(run, key=key, priority=HEAVY_JOB_PRIORITY[kind])
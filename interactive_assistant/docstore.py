@@ -0,0 +1,181 @@
+import codecs
+import hashlib
+import mmap
+import os
+import tempfile
+import weakref
+from typing import Iterable, Iterator, Optional, Union
+
+# ----------------------------
+# Configuration
+# ----------------------------
+
+SPILL_DIR = os.getenv("DOCSTORE_DIR") or None
+TEXT_CHUNK_BYTES = 16 * 1024
+
+
+def _release(mm: Optional[mmap.mmap], path: str) -> None:
+    if mm is not None:
+        mm.close()
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# ----------------------------
+# Document Handle
+# ----------------------------
+
+class DocumentHandle:
+    """
+    Read-only view of extracted document text spilled to disk.
+
+    The text lives in a memory-mapped UTF-8 file, so stages pass this
+    small handle around instead of copies of the full string. Pages are
+    loaded by the OS on access and can be dropped again under pressure.
+    The file is removed on close() or when the handle is garbage collected.
+    """
+
+    def __init__(self, path: str, length: int, word_count: int, digest: str):
+        self.path = path
+        self.length = length
+        self.word_count = word_count
+        self.digest = digest
+
+        self._mm = None
+        if length:
+            with open(path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._finalizer = weakref.finalize(self, _release, self._mm, path)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __enter__(self) -> "DocumentHandle":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._finalizer()
+
+    def view(self, start: int = 0, end: Optional[int] = None) -> memoryview:
+        """
+        Zero-copy byte slice of the UTF-8 text.
+        """
+        if self._mm is None:
+            return memoryview(b"")
+        return memoryview(self._mm)[start:end]
+
+    def iter_text(self, chunk_bytes: int = TEXT_CHUNK_BYTES) -> Iterator[str]:
+        """
+        Yields the text in decoded chunks without materializing it whole.
+        Multi-byte characters split across chunk boundaries are handled.
+        """
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+
+        for start in range(0, self.length, chunk_bytes):
+            with self.view(start, start + chunk_bytes) as chunk:
+                text = decoder.decode(chunk)
+            if text:
+                yield text
+
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    def text(self, start: int = 0, end: Optional[int] = None) -> str:
+        """
+        Decodes a slice of the text. Use sparingly on large documents.
+        """
+        with self.view(start, end) as chunk:
+            return bytes(chunk).decode("utf-8", "replace")
+
+
+# ----------------------------
+# Document Writer
+# ----------------------------
+
+class DocumentWriter:
+    """
+    Text sink that spills to a temporary file while counting words and
+    hashing the content. Has a text-mode `write()` so extractors such as
+    pdfminer can write into it directly.
+    """
+
+    mode = "w"
+
+    def __init__(self):
+        fd, self.path = tempfile.mkstemp(prefix="doc-", suffix=".txt", dir=SPILL_DIR)
+        self._file = os.fdopen(fd, "wb")
+        self._hash = hashlib.sha256()
+        self._length = 0
+        self._word_count = 0
+        self._in_word = False
+
+    def write(self, text: str) -> int:
+        data = text.encode("utf-8")
+        self._file.write(data)
+        self._hash.update(data)
+        self._length += len(data)
+
+        # Count words incrementally so callers never need text.split()
+        words = len(text.split())
+        if words and self._in_word and not text[0].isspace():
+            words -= 1
+        self._word_count += words
+        if text:
+            self._in_word = not text[-1].isspace()
+
+        return len(text)
+
+    def finish(self) -> DocumentHandle:
+        self._file.close()
+        return DocumentHandle(
+            self.path,
+            self._length,
+            self._word_count,
+            self._hash.hexdigest()
+        )
+
+    def abort(self) -> None:
+        self._file.close()
+        _release(None, self.path)
+
+
+def spill_text(chunks: Union[str, Iterable[str]]) -> DocumentHandle:
+    """
+    Writes text (a string or an iterable of chunks) to a new document.
+    """
+    writer = DocumentWriter()
+    try:
+        if isinstance(chunks, str):
+            writer.write(chunks)
+        else:
+            for chunk in chunks:
+                writer.write(chunk)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.finish()
+
+
+def iter_document_text(document: Union[str, DocumentHandle]) -> Iterator[str]:
+    """
+    Yields the text of a document handle in chunks, or a plain string as is.
+    """
+    if isinstance(document, str):
+        yield document
+    else:
+        yield from document.iter_text()
+
+
+def document_digest(document: Union[str, DocumentHandle, None]) -> str:
+    if document is None:
+        return ""
+    if isinstance(document, str):
+        return hashlib.sha256(document.encode("utf-8")).hexdigest()
+    return document.digest
@@ -0,0 +1,311 @@
+import itertools
+import queue
+import threading
+import time
+import uuid
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+# ----------------------------
+# Configuration
+# ----------------------------
+
+JOB_WORKERS = 4
+MAX_PENDING_JOBS = 32
+DEFAULT_JOB_TIMEOUT_S = 180.0
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+EXPIRED = "expired"
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobQueueFull(RuntimeError):
+    pass
+
+
+# ----------------------------
+# Job
+# ----------------------------
+
+class Job:
+    """
+    A unit of background work.
+    The job function receives the Job and may call `report()` to publish
+    progress and `check()` to stop early on cancellation or deadline.
+    Code it calls can use `report_progress()` for the same effect.
+    """
+
+    def __init__(self, fn: Callable[["Job"], Any], key: Optional[str],
+                 priority: int, timeout_s: Optional[float]):
+        self.id = str(uuid.uuid4())
+        self.key = key
+        self.priority = priority
+        self.fn = fn
+        self.created_at = time.monotonic()
+        self.deadline = self.created_at + timeout_s if timeout_s else None
+
+        self.status = QUEUED
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.progress: List[Dict] = []
+        self.subscribers = 1
+
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    # ---- Progress / cancellation (called from the job function) ----
+
+    def report(self, message: str) -> None:
+        with self._lock:
+            self.progress.append({
+                "at": time.monotonic() - self.created_at,
+                "message": message
+            })
+
+    def check(self) -> None:
+        if self._cancel.is_set():
+            raise JobCancelled(CANCELLED)
+        if self.expired:
+            raise JobCancelled(EXPIRED)
+
+    # ---- Caller side ----
+
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() > self.deadline
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def latest_progress(self) -> Optional[str]:
+        with self._lock:
+            return self.progress[-1]["message"] if self.progress else None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def _finish(self, status: str, result: Any = None,
+                error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            if self._done.is_set():
+                return
+            self.status = status
+            self.result = result
+            self.error = error
+            self._done.set()
+
+
+# ----------------------------
+# Job Handle
+# ----------------------------
+
+class JobHandle:
+    """
+    One caller's view of a job that several callers may share.
+    Cancelling a handle withdraws only that caller's interest, once;
+    the job itself stops when every handle on it has been cancelled.
+    """
+
+    def __init__(self, job_queue: "JobQueue", job: Job):
+        self.job = job
+        self.cancelled = False
+        self._queue = job_queue
+
+    @property
+    def id(self) -> str:
+        return self.job.id
+
+    @property
+    def status(self) -> str:
+        return self.job.status
+
+    @property
+    def result(self) -> Any:
+        return self.job.result
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        return self.job.error
+
+    @property
+    def finished(self) -> bool:
+        return self.job.finished
+
+    @property
+    def latest_progress(self) -> Optional[str]:
+        return self.job.latest_progress
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self.job.wait(timeout)
+
+    def cancel(self) -> None:
+        self._queue._unsubscribe(self)
+
+
+# ----------------------------
+# Queue
+# ----------------------------
+
+class JobQueue:
+    """
+    Fixed-size worker pool fed by a bounded priority queue.
+    - Lower priority numbers run first, FIFO within a priority
+    - Jobs submitted with the same key while one is pending coalesce
+    - Jobs past their deadline are expired instead of started
+    - Jobs cancelled while queued free their slot immediately
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, max_pending: int = MAX_PENDING_JOBS):
+        self.max_pending = max_pending
+
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._active: Dict[str, Job] = {}
+        self._pending = 0
+        self._running = 0
+
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, fn: Callable[[Job], Any], key: Optional[str] = None,
+               priority: int = PRIORITY_NORMAL,
+               timeout_s: Optional[float] = DEFAULT_JOB_TIMEOUT_S) -> JobHandle:
+        with self._lock:
+            existing = self._active.get(key) if key else None
+            # A job every caller cancelled is winding down; start fresh
+            if existing is not None and not existing.finished and not existing._cancel.is_set():
+                existing.subscribers += 1
+                return JobHandle(self, existing)
+
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(
+                    f"Job queue is full ({self.max_pending} pending jobs)"
+                )
+
+            job = Job(fn, key, priority, timeout_s)
+            if key:
+                self._active[key] = job
+            self._pending += 1
+
+        self._queue.put((priority, next(self._sequence), job))
+        return JobHandle(self, job)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"pending": self._pending, "running": self._running}
+
+    def _unsubscribe(self, handle: JobHandle) -> None:
+        """
+        Cancels one handle. Subscriber counts, queue slots and the
+        queued -> running change are all guarded by the queue lock, so
+        a cancel and a worker picking up the job cannot interleave.
+        """
+        job = handle.job
+
+        with self._lock:
+            if handle.cancelled:
+                return
+            handle.cancelled = True
+
+            job.subscribers -= 1
+            if job.subscribers > 0 or job.finished:
+                return
+            job._cancel.set()
+
+            if job.status != QUEUED:
+                # Running jobs stop at their next check()
+                return
+
+            # The worker skips finished jobs when it pops them later
+            self._pending -= 1
+            self._forget(job)
+
+        job._finish(CANCELLED)
+
+    def _forget(self, job: Job) -> None:
+        if job.key and self._active.get(job.key) is job:
+            del self._active[job.key]
+
+    def _worker(self) -> None:
+        while True:
+            _, _, job = self._queue.get()
+
+            with self._lock:
+                if job.finished:
+                    continue
+                self._pending -= 1
+                self._running += 1
+                job.status = RUNNING
+
+            try:
+                job.check()
+                job.report("Started")
+                result = run_as_current(job, lambda: job.fn(job))
+            except JobCancelled as e:
+                job._finish(str(e))
+            except Exception as e:
+                job._finish(FAILED, error=e)
+            else:
+                job._finish(DONE, result=result)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._forget(job)
+
+
+# ----------------------------
+# Current Job Helpers
+# ----------------------------
+
+_local = threading.local()
+
+
+def current_job() -> Optional[Job]:
+    return getattr(_local, "job", None)
+
+
+def run_as_current(job: Job, fn: Callable[[], Any]) -> Any:
+    """
+    Runs `fn` with `job` as the current job, so code deeper in the call
+    stack can report progress without threading the job through.
+    """
+    previous = current_job()
+    _local.job = job
+    try:
+        return fn()
+    finally:
+        _local.job = previous
+
+
+def report_progress(message: str) -> None:
+    job = current_job()
+    if job is not None:
+        job.report(message)
+        job.check()
+
+
+@lru_cache(maxsize=1)
+def get_job_queue() -> JobQueue:
+    """
+    Process-wide job queue, shared by every Streamlit session.
+    """
+    return JobQueue()
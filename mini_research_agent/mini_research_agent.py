@@ -1,84 +1,32 @@
-from dotenv import load_dotenv
 import os
-import requests
-from tavily import TavilyClient
+import sys
 
-load_dotenv()
+# Add project root to PYTHONPATH so the shared modules import
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
 
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 
-tavily = TavilyClient(api_key=TAVILY_API_KEY)
+def research(topic):
+    """
+    Runs the shared research graph with the fast profile:
+    fewer sub-questions, the top result for each, and a small model.
+    """
+    # LangGraph and the agents load only once research runs
+    from multiagent_system.graph import build_graph
+    from multiagent_system.profiles import FAST_PROFILE
 
-
-def openrouter_chat(
-    prompt,
-    model="meta-llama/llama-3.3-70b-instruct:free",
-    temperature=0.3
-):
-    url = "https://openrouter.ai/api/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "http://localhost",
-        "X-Title": "Mini Research Agent"
-    }
-    data = {
-        "model": model,
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": temperature
-    }
-
-    response = requests.post(url, headers=headers, json=data)
-    response.raise_for_status()
-
-    result = response.json()
-    if "choices" not in result:
-        raise RuntimeError(f"OpenRouter error: {result}")
-
-    return result["choices"][0]["message"]["content"]
-
-
-def generate_subquestions(topic):
-    prompt = f"Generate exactly 3 concise research sub-questions about: {topic}"
-    text = openrouter_chat(prompt)
-    return [q.strip("- ").strip() for q in text.split("\n") if q.strip()]
-
-
-def search_answers(questions):
-    answers = []
-    for q in questions:
-        result = tavily.search(query=q, search_depth="basic")
-        answers.append(
-            result["results"][0]["content"]
-            if result.get("results")
-            else "No results found"
-        )
-    return answers
-
-
-def summarize(topic, questions, answers):
-    combined = "\n".join(
-        [f"Q: {q}\nA: {a}" for q, a in zip(questions, answers)]
-    )
-    prompt = (
-        f"Topic: {topic}\n\n"
-        f"Write one concise summary paragraph based on the information below:\n"
-        f"{combined}"
-    )
-    return openrouter_chat(prompt)
+    return build_graph().invoke({"topic": topic, "profile": FAST_PROFILE})
 
 
 if __name__ == "__main__":
     topic = input("Enter research topic: ")
 
-    subquestions = generate_subquestions(topic)
+    result = research(topic)
+
     print("\nGenerated Sub-Questions:")
-    for q in subquestions:
+    for q in result["plan"].questions:
         print("-", q)
 
-    answers = search_answers(subquestions)
-
-    final_summary = summarize(topic, subquestions, answers)
     print("\nFinal Summary:\n")
-    print(final_summary)
+    print(result["final_summary"])
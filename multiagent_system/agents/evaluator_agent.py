@@ -0,0 +1,119 @@
+import time
+from typing import Dict, List
+
+from multiagent_system.budget import (
+    DEFAULT_SUMMARY_TOKENS,
+    estimate_refinement_cost,
+    normalize_budget
+)
+from multiagent_system.profiles import DEFAULT_PROFILE
+from multiagent_system.snippets import estimate_tokens, key_terms, words
+from multiagent_system.sources import SearchResult
+
+# ----------------------------
+# Coverage Heuristics
+# ----------------------------
+
+COVERAGE_THRESHOLD = 0.6
+TARGET_WORDS = 150
+TARGET_DIVERSITY = 0.5
+
+LENGTH_WEIGHT = 0.4
+OVERLAP_WEIGHT = 0.4
+DIVERSITY_WEIGHT = 0.2
+
+
+def score_coverage(question: str, findings: List[SearchResult]) -> float:
+    """
+    Scores how well the findings cover a question, from 0 to 1.
+    - Length: enough words to say something substantive
+    - Overlap: share of the question's key terms found in the text
+    - Diversity: unique-word ratio, low for repeated boilerplate
+    """
+    tokens = words(" ".join(result.snippet for result in findings))
+    if not tokens:
+        return 0.0
+
+    length_score = min(len(tokens) / TARGET_WORDS, 1.0)
+
+    terms = key_terms(question)
+    if terms:
+        overlap_score = len(terms & set(tokens)) / len(terms)
+    else:
+        # Nothing to match against: fall back to the length signal.
+        overlap_score = length_score
+
+    diversity_score = min(len(set(tokens)) / len(tokens) / TARGET_DIVERSITY, 1.0)
+
+    return (
+        LENGTH_WEIGHT * length_score
+        + OVERLAP_WEIGHT * overlap_score
+        + DIVERSITY_WEIGHT * diversity_score
+    )
+
+
+def evaluator_agent(state: Dict) -> Dict:
+    """
+    Evaluator Agent:
+    - Scores result coverage for each sub-question locally
+    - Marks weakly covered questions for targeted re-search
+    - Stops re-searching a question whose score did not improve in the
+      last round, since another search is unlikely to help it
+    - Counts refinement rounds for the routing decision
+    """
+
+    search_results = state["search_results"]
+    previous = state.get("coverage") or {}
+
+    coverage = {
+        question: round(score_coverage(question, findings), 3)
+        for question, findings in search_results.items()
+    }
+
+    weak_questions = [
+        question for question, score in coverage.items()
+        if score < COVERAGE_THRESHOLD
+        and (question not in previous or score > previous[question])
+    ]
+
+    return {
+        **state,
+        "coverage": coverage,
+        "weak_questions": weak_questions,
+        "refinement_round": state.get("refinement_round", 0) + 1
+    }
+
+
+def route_after_evaluation(state: Dict) -> str:
+    """
+    Decides whether to re-search weak questions or move on to the writer.
+    Exits early when coverage is sufficient, the round limit is reached,
+    or another search round would overrun the latency or token budget.
+    """
+
+    if not state.get("weak_questions"):
+        return "writer"
+
+    profile = state.get("profile") or DEFAULT_PROFILE
+    if state["refinement_round"] > profile.max_refinement_rounds:
+        return "writer"
+
+    budget = normalize_budget(state.get("budget"))
+    round_cost = estimate_refinement_cost(len(state["weak_questions"]))
+
+    elapsed = time.monotonic() - state.get("started_at", time.monotonic())
+    if elapsed + round_cost["latency_s"] > budget["latency_s"]:
+        return "writer"
+
+    # Evidence gathered so far plus the summary allowance, against the
+    # same token budget the plan was fitted to
+    evidence_tokens = sum(
+        estimate_tokens(result.snippet)
+        for findings in state["search_results"].values()
+        for result in findings
+    )
+    summary_tokens = state["plan"].summary_tokens or DEFAULT_SUMMARY_TOKENS
+    if evidence_tokens + summary_tokens + round_cost["tokens"] > budget["max_tokens"]:
+        return "writer"
+
+    return "searcher"
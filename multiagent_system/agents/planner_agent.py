@@ -1,14 +1,61 @@
 from typing import Dict, List
-from dotenv import load_dotenv
-import os
-import requests
+import time
+
+from multiagent_system.budget import (
+    MAX_RESULTS_LIMIT,
+    MAX_SUB_QUESTIONS,
+    MIN_SUB_QUESTIONS,
+    fit_plan_to_budget,
+    normalize_budget
+)
+from multiagent_system.llm import chat_completion
+from multiagent_system.plan import (
+    PlanParseError,
+    parse_plan,
+    plan_response_format
+)
+from multiagent_system.profiles import DEFAULT_PROFILE, PipelineProfile
+
+MAX_PLAN_RETRIES = 1
+RETRY_INSTRUCTION = (
+    "Your previous reply was not a valid JSON plan. "
+    "Reply again with only the complete JSON object."
+)
+
+
+def request_plan(messages: List[Dict], response_format: Dict, profile: PipelineProfile) -> str:
+    return chat_completion(
+        messages,
+        model=profile.model,
+        title=profile.title,
+        caller="planner agent",
+        response_format=response_format
+    )
+
+
+def adaptive_plan_prompt(topic: str, budget: Dict) -> str:
+    return f"""
+You are a research planner.
 
-load_dotenv()
+Given the research topic below, decide how much research it needs.
+Simple or narrow topics need {MIN_SUB_QUESTIONS}-2 sub-questions with basic searches.
+Broad or contested topics need up to {MAX_SUB_QUESTIONS} sub-questions and may use
+advanced searches with more results.
 
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+Stay within this budget:
+- About {budget["latency_s"]} seconds in total (a basic search takes ~1.5s, an advanced one ~3s)
+- About {budget["max_tokens"]} tokens of evidence (each search result adds ~250 tokens)
 
-OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
-MODEL_ID = "amazon/nova-lite-v1"
+Topic:
+{topic}
+
+Respond strictly in JSON format with keys:
+- sub_questions (list of objects with keys:
+  question (string),
+  search_depth ("basic" or "advanced"),
+  max_results (integer between 1 and {MAX_RESULTS_LIMIT}))
+- output_format (string)
+"""
 
 
 def planner_agent(state: Dict) -> Dict:
@@ -17,15 +64,25 @@ def planner_agent(state: Dict) -> Dict:
     - Takes a research topic
     - Generates structured sub-questions
     - Defines expected output format
+    - In adaptive mode (a budget is given), sizes the plan to the topic
+    - Parses the reply once into a typed ResearchPlan, repairing
+      truncated JSON locally before retrying the LLM call
     """
 
     topic = state["topic"]
-
-    prompt = f"""
+    budget = state.get("budget")
+    profile = state.get("profile") or DEFAULT_PROFILE
+    started_at = state.get("started_at", time.monotonic())
+
+    if budget is not None:
+        budget = normalize_budget(budget)
+        prompt = adaptive_plan_prompt(topic, budget)
+    else:
+        prompt = f"""
 You are a research planner.
 
 Given the research topic below, generate:
-1. Exactly 3 detailed research sub-questions
+1. Exactly {profile.sub_questions} detailed research sub-questions
 2. A short description of the expected final output format
 
 Topic:
@@ -36,47 +93,37 @@ Respond strictly in JSON format with keys:
 - output_format (string)
 """
 
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "http://localhost",
-        "X-Title": "Multi-Agent Research System"
-    }
-
-    payload = {
-        "model": MODEL_ID,
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.3
-    }
-
-    response = requests.post(OPENROUTER_URL, headers=headers, json=payload)
-    response.raise_for_status()
-
-    data = response.json()
-
-    if "choices" not in data:
-        raise RuntimeError(
-         f"OpenRouter error in planner agent: {data}"
-        )
-
-    import re
-    import json
-
-    raw_text = data["choices"][0]["message"]["content"]
-
-    match = re.search(r"\{.*\}", raw_text, re.DOTALL)
-
-    if not match:
-        raise RuntimeError(
-            f"Planner did not return valid JSON. Raw output:\n{raw_text}"
-        )
-
-    plan_json = match.group()
-
-    json.loads(plan_json)
+    messages = [{"role": "user", "content": prompt}]
+    response_format = plan_response_format(adaptive=budget is not None)
+
+    raw_text = request_plan(messages, response_format, profile)
+
+    for attempt in range(MAX_PLAN_RETRIES + 1):
+        try:
+            plan = parse_plan(raw_text)
+            break
+        except PlanParseError:
+            if attempt == MAX_PLAN_RETRIES:
+                raise
+
+        # Local parsing and repair failed: ask the model to fix its reply.
+        messages = messages + [
+            {"role": "assistant", "content": raw_text},
+            {"role": "user", "content": RETRY_INSTRUCTION}
+        ]
+        raw_text = request_plan(messages, response_format, profile)
+
+    if budget is not None:
+        plan = fit_plan_to_budget(plan, budget)
+    else:
+        # Fixed mode: the profile decides the plan's shape.
+        del plan.sub_questions[profile.sub_questions:]
+        for item in plan.sub_questions:
+            item.search_depth = profile.search_depth
+            item.max_results = profile.max_results
 
     return {
         **state,
-        "plan": plan_json
+        "started_at": started_at,
+        "plan": plan
     }
-
@@ -1,50 +1,93 @@
 from typing import Dict
 from dotenv import load_dotenv
+from functools import lru_cache
 import os
-from tavily import TavilyClient
+
+from multiagent_system.budget import (
+    MAX_RESULTS_LIMIT,
+    REFINE_EXTRA_RESULTS,
+    TOKENS_PER_RESULT
+)
+from multiagent_system.plan import ResearchPlan, SubQuestion
+from multiagent_system.profiles import DEFAULT_PROFILE, map_concurrently
+from multiagent_system.snippets import compress_snippets
 
 load_dotenv()
 
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
+TAVILY_API_BASE_URL = os.getenv("TAVILY_API_BASE_URL")
+
+
+@lru_cache(maxsize=1)
+def get_tavily_client():
+    """
+    Creates the Tavily client on first search rather than at import.
+    """
+    from tavily import TavilyClient
 
-tavily = TavilyClient(api_key=TAVILY_API_KEY)
+    return TavilyClient(api_key=TAVILY_API_KEY, api_base_url=TAVILY_API_BASE_URL)
 
 
 def searcher_agent(state: Dict) -> Dict:
     """
     Searcher Agent:
     - Takes sub-questions from planner output
-    - Uses Tavily to fetch information
-    - Returns structured search results
+    - Uses Tavily to fetch information, with the depth and result
+      count the plan chose for each sub-question, searching
+      sub-questions concurrently
+    - On refinement rounds, re-searches only the weak questions with
+      advanced depth and merges the new findings
+    - Deduplicates and compresses snippets to the question's token
+      allowance
+    - Returns SearchResult records (url, title, score, snippet) per
+      sub-question so the writer can cite them
     """
 
-    plan = state["plan"]
+    plan: ResearchPlan = state["plan"]
+    profile = state.get("profile") or DEFAULT_PROFILE
+    weak_questions = set(state.get("weak_questions") or [])
 
-    
-    import json
-    plan_data = json.loads(plan)
+    search_sources = dict(state.get("search_sources") or {})
+    search_results = dict(state.get("search_results") or {})
 
-    sub_questions = plan_data["sub_questions"]
+    if weak_questions:
+        pending = [item for item in plan.sub_questions if item.question in weak_questions]
+    else:
+        pending = list(plan.sub_questions)
 
-    search_results = {}
+    tavily = get_tavily_client()
+
+    def search(item: SubQuestion):
+        question = item.question
+
+        if weak_questions:
+            search_depth = "advanced"
+            max_results = min(item.max_results + REFINE_EXTRA_RESULTS, MAX_RESULTS_LIMIT)
+        else:
+            search_depth = item.search_depth
+            max_results = item.max_results
 
-    for question in sub_questions:
         response = tavily.search(
             query=question,
-            search_depth="basic",
-            max_results=3
+            search_depth=search_depth,
+            max_results=max_results
         )
 
-        if response.get("results"):
-            combined_answer = " ".join(
-                result["content"] for result in response["results"]
-            )
-        else:
-            combined_answer = "No relevant results found."
+        sources = search_sources.get(question, []) + response.get("results", [])
+        results = compress_snippets(
+            question,
+            sources,
+            token_cap=max_results * TOKENS_PER_RESULT
+        )
+        return question, sources, results
 
-        search_results[question] = combined_answer
+    # Sub-questions are independent, so they are searched concurrently.
+    for question, sources, results in map_concurrently(search, pending, profile.search_workers):
+        search_sources[question] = sources
+        search_results[question] = results
 
     return {
         **state,
+        "search_sources": search_sources,
         "search_results": search_results
     }
@@ -1,64 +1,83 @@
 from typing import Dict
-from dotenv import load_dotenv
-import os
-import requests
-import json
 
-load_dotenv()
-
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-
-OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
-MODEL_ID = "amazon/nova-lite-v1"
+from multiagent_system.budget import summary_word_limit
+from multiagent_system.llm import chat_completion
+from multiagent_system.plan import ResearchPlan
+from multiagent_system.profiles import DEFAULT_PROFILE
+from multiagent_system.sources import (
+    format_references,
+    format_source_list,
+    number_sources
+)
 
 
 def writer_agent(state: Dict) -> Dict:
     """
     Writer Agent:
     - Synthesizes planner instructions and search results
-    - Produces a structured final summary
+    - Produces a structured final summary, following the caller's
+      length and style instructions when given
+    - Keeps the summary within the plan's token allowance, if any,
+      with a word target below the hard token cap
+    - Cites numbered sources inline and appends resolved reference links
     """
 
-    plan = json.loads(state["plan"])
-    search_results = state["search_results"]
+    plan: ResearchPlan = state["plan"]
+    profile = state.get("profile") or DEFAULT_PROFILE
+    findings, sources = number_sources(state["search_results"])
+
+    summary_words = state.get("summary_words") or profile.summary_words
+    summary_style = state.get("summary_style") or profile.summary_style
+
+    length_instruction = ""
+    if summary_words:
+        length_instruction += f"\nLength: {summary_words}"
+    if plan.summary_tokens:
+        # max_tokens below is a hard cap; aim well under it so the
+        # summary is never cut off mid-sentence
+        length_instruction += (
+            f"\nKeep the summary under {summary_word_limit(plan.summary_tokens)} words "
+            "and end with a complete sentence."
+        )
+    if length_instruction:
+        length_instruction += "\n"
 
     prompt = f"""
 You are a research writer.
 
 Planner instructions:
-- Sub-questions: {plan["sub_questions"]}
-- Expected output format: {plan["output_format"]}
+- Sub-questions: {plan.questions}
+- Expected output format: {plan.output_format}
 
-Research findings:
-{json.dumps(search_results, indent=2)}
+Sources:
+{format_source_list(sources)}
+
+Research findings (each snippet is tagged with its source number):
+{findings}
 
 Write a well-structured, clear, and concise final research summary.
+{length_instruction}{summary_style or ""}
+CITATIONS:
+- Cite sources inline with their numbers, e.g. [1] or [2][3]
+- Only cite the numbered sources above
+- Do NOT write a References section; it is added automatically
 """
 
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "http://localhost",
-        "X-Title": "Multi-Agent Research System"
-    }
-
-    payload = {
-        "model": MODEL_ID,
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.3
-    }
-
-    response = requests.post(OPENROUTER_URL, headers=headers, json=payload)
-    response.raise_for_status()
-
-    data = response.json()
-
-    if "choices" not in data:
-        raise RuntimeError(
-            f"OpenRouter error in writer agent: {data}"
-        )
-
-    final_summary = data["choices"][0]["message"]["content"]
+    options = {}
+    if plan.summary_tokens:
+        options["max_tokens"] = plan.summary_tokens
+
+    final_summary = chat_completion(
+        [{"role": "user", "content": prompt}],
+        model=profile.model,
+        title=profile.title,
+        caller="writer agent",
+        **options
+    ).strip()
+
+    references = format_references(final_summary, sources)
+    if references:
+        final_summary = f"{final_summary}\n\n{references}"
 
     return {
         **state,
@@ -0,0 +1,149 @@
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from multiagent_system.plan import ResearchPlan, SubQuestion
+
+
+# ----------------------------
+# Cost Model
+# ----------------------------
+# Rough per-call estimates used to size a research plan. They only need
+# to be good enough to rank plans, not to predict wall-clock time.
+
+SEARCH_LATENCY_S = {
+    "basic": 1.5,
+    "advanced": 3.0
+}
+LLM_CALL_LATENCY_S = 4.0
+TOKENS_PER_RESULT = 250
+
+MIN_SUB_QUESTIONS = 1
+MAX_SUB_QUESTIONS = 5
+MAX_RESULTS_LIMIT = 10
+
+DEFAULT_SEARCH_DEPTH = "basic"
+DEFAULT_MAX_RESULTS = 3
+DEFAULT_SUMMARY_TOKENS = 800
+MIN_SUMMARY_TOKENS = 300
+
+# Extra results requested when re-searching a weakly covered question
+REFINE_EXTRA_RESULTS = 2
+
+# English prose runs at roughly 0.75 words per token. The writer is asked
+# for fewer words than its token cap allows, so it finishes its last
+# sentence before the cap cuts it off.
+WORDS_PER_TOKEN = 0.75
+SUMMARY_WORD_HEADROOM = 0.8
+
+DEFAULT_BUDGET = {
+    "latency_s": 30.0,
+    "max_tokens": 6000
+}
+
+
+def normalize_budget(budget: Optional[Dict]) -> Dict:
+    """
+    Fills in missing budget keys with defaults.
+    - latency_s: wall-clock budget for one research run
+    - max_tokens: tokens of evidence plus summary handed to the writer
+    """
+    normalized = dict(DEFAULT_BUDGET)
+    normalized.update({k: v for k, v in (budget or {}).items() if v is not None})
+    return normalized
+
+
+def estimate_cost(sub_questions: List["SubQuestion"]) -> Dict:
+    """
+    Estimates latency and evidence tokens for a list of sub-questions.
+    Planner and writer calls are included in the latency estimate.
+    """
+    latency_s = 2 * LLM_CALL_LATENCY_S
+    tokens = 0
+
+    for item in sub_questions:
+        latency_s += SEARCH_LATENCY_S[item.search_depth]
+        tokens += item.max_results * TOKENS_PER_RESULT
+
+    return {"latency_s": latency_s, "tokens": tokens}
+
+
+def estimate_refinement_cost(question_count: int) -> Dict:
+    """
+    Estimates one refinement round: an advanced re-search with
+    REFINE_EXTRA_RESULTS more results per question, plus an LLM call's
+    worth of latency as a safety margin for the writer.
+    """
+    return {
+        "latency_s": SEARCH_LATENCY_S["advanced"] * question_count + LLM_CALL_LATENCY_S,
+        "tokens": question_count * REFINE_EXTRA_RESULTS * TOKENS_PER_RESULT
+    }
+
+
+def _over_budget(sub_questions: List["SubQuestion"], budget: Dict) -> Dict:
+    cost = estimate_cost(sub_questions)
+    return {
+        "latency": cost["latency_s"] > budget["latency_s"],
+        "tokens": cost["tokens"] + MIN_SUMMARY_TOKENS > budget["max_tokens"]
+    }
+
+
+def _shrink(sub_questions: List["SubQuestion"], over: Dict) -> bool:
+    """
+    Applies the cheapest single reduction that helps the exceeded limit:
+    - latency: downgrade advanced searches, then drop questions
+    - tokens: trim result counts, then drop questions
+    Returns False once nothing is left to reduce.
+    """
+    if over["latency"]:
+        for item in reversed(sub_questions):
+            if item.search_depth == "advanced":
+                item.search_depth = "basic"
+                return True
+
+    if over["tokens"]:
+        widest = max(sub_questions, key=lambda item: item.max_results)
+        if widest.max_results > 1:
+            widest.max_results -= 1
+            return True
+
+    if len(sub_questions) > MIN_SUB_QUESTIONS:
+        sub_questions.pop()
+        return True
+
+    return False
+
+
+def fit_plan_to_budget(plan: "ResearchPlan", budget: Optional[Dict]) -> "ResearchPlan":
+    """
+    Clamps a planner-proposed plan so its estimated cost fits the budget.
+    - Caps the number of sub-questions
+    - Reduces search depth and result counts before dropping questions
+    - Sets the writer's summary token allowance from what is left
+    Returns a new plan; the parsed plan is left unchanged.
+    """
+    budget = normalize_budget(budget)
+    sub_questions = [item.model_copy() for item in plan.sub_questions[:MAX_SUB_QUESTIONS]]
+
+    while sub_questions:
+        over = _over_budget(sub_questions, budget)
+        if not any(over.values()) or not _shrink(sub_questions, over):
+            break
+
+    evidence_tokens = estimate_cost(sub_questions)["tokens"]
+    summary_tokens = min(
+        DEFAULT_SUMMARY_TOKENS,
+        max(int(budget["max_tokens"]) - evidence_tokens, MIN_SUMMARY_TOKENS)
+    )
+
+    return plan.model_copy(update={
+        "sub_questions": sub_questions,
+        "summary_tokens": summary_tokens
+    })
+
+
+def summary_word_limit(summary_tokens: int) -> int:
+    """
+    Word target for a summary whose hard cap is `summary_tokens` tokens.
+    """
+    words = int(summary_tokens * WORDS_PER_TOKEN * SUMMARY_WORD_HEADROOM)
+    return max(words // 10 * 10, 50)
@@ -1,6 +1,14 @@
 from typing import TypedDict, List, Dict
 from langgraph.graph import StateGraph, END
 
+from multiagent_system.plan import ResearchPlan
+from multiagent_system.profiles import PipelineProfile
+from multiagent_system.sources import SearchResult
+
+from multiagent_system.agents.evaluator_agent import (
+    evaluator_agent,
+    route_after_evaluation
+)
 from multiagent_system.agents.planner_agent import planner_agent
 from multiagent_system.agents.searcher_agent import searcher_agent
 from multiagent_system.agents.writer_agent import writer_agent
@@ -8,27 +16,45 @@ from multiagent_system.agents.writer_agent import writer_agent
 
 class ResearchState(TypedDict):
     topic: str
-    plan: str
-    search_results: Dict[str, str]
+    profile: PipelineProfile
+    budget: Dict[str, float]
+    started_at: float
+    plan: ResearchPlan
+    search_sources: Dict[str, List[Dict]]
+    search_results: Dict[str, List[SearchResult]]
+    coverage: Dict[str, float]
+    weak_questions: List[str]
+    refinement_round: int
+    summary_words: str
+    summary_style: str
     final_summary: str
 
 
 def build_graph():
     """
     Builds the LangGraph execution pipeline:
-    User Input → Planner → Searcher → Writer → Final Output
+    User Input → Planner → Searcher → Evaluator → Writer → Final Output
+
+    The evaluator loops back to the searcher for weakly covered
+    sub-questions until coverage is sufficient or the budget runs out.
     """
 
     graph = StateGraph(ResearchState)
 
     graph.add_node("planner", planner_agent)
     graph.add_node("searcher", searcher_agent)
+    graph.add_node("evaluator", evaluator_agent)
     graph.add_node("writer", writer_agent)
 
     graph.set_entry_point("planner")
 
     graph.add_edge("planner", "searcher")
-    graph.add_edge("searcher", "writer")
+    graph.add_edge("searcher", "evaluator")
+    graph.add_conditional_edges(
+        "evaluator",
+        route_after_evaluation,
+        {"searcher": "searcher", "writer": "writer"}
+    )
     graph.add_edge("writer", END)
 
     return graph.compile()
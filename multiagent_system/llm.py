@@ -0,0 +1,127 @@
+import os
+from functools import lru_cache
+from json.encoder import encode_basestring
+from typing import Dict, Iterable, Iterator, List
+
+import orjson
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+load_dotenv()
+
+OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+OPENROUTER_URL = os.getenv(
+    "OPENROUTER_URL",
+    "https://openrouter.ai/api/v1/chat/completions"
+)
+
+POOL_SIZE = 16
+REQUEST_TIMEOUT_S = 120
+
+CONTENT_PLACEHOLDER = "__STREAMED_CONTENT__"
+
+
+@lru_cache(maxsize=1)
+def get_http_session() -> requests.Session:
+    """
+    Shared HTTP session so every LLM call reuses pooled keep-alive
+    connections instead of opening a new TLS connection per request.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _headers(title: str) -> Dict:
+    return {
+        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "http://localhost",
+        "X-Title": title
+    }
+
+
+def _read_completion(response: requests.Response, caller: str) -> str:
+    response.raise_for_status()
+
+    data = orjson.loads(response.content)
+
+    if "choices" not in data:
+        raise RuntimeError(
+            f"OpenRouter error in {caller}: {data}"
+        )
+
+    return data["choices"][0]["message"]["content"]
+
+
+def chat_completion(
+    messages: List[Dict],
+    model: str,
+    temperature: float = 0.3,
+    title: str = "Multi-Agent Research System",
+    caller: str = "LLM call",
+    **options
+) -> str:
+    """
+    Sends one OpenRouter chat completion and returns the message text.
+    Extra keyword arguments (max_tokens, response_format, ...) are added
+    to the request payload.
+    """
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        **options
+    }
+
+    response = get_http_session().post(
+        OPENROUTER_URL,
+        headers=_headers(title),
+        json=payload,
+        timeout=REQUEST_TIMEOUT_S
+    )
+    return _read_completion(response, caller)
+
+
+def _stream_body(payload: Dict, content_chunks: Iterable[str]) -> Iterator[bytes]:
+    body = orjson.dumps(payload)
+    prefix, suffix = body.split(orjson.dumps(CONTENT_PLACEHOLDER), 1)
+
+    yield prefix + b'"'
+    for chunk in content_chunks:
+        # Escape the chunk as a JSON string body. The stdlib encoder is
+        # used here because orjson over-allocates for large strings.
+        yield encode_basestring(chunk)[1:-1].encode("utf-8")
+    yield b'"' + suffix
+
+
+def chat_completion_from_chunks(
+    content_chunks: Iterable[str],
+    model: str,
+    temperature: float = 0.3,
+    title: str = "Multi-Agent Research System",
+    caller: str = "LLM call",
+    **options
+) -> str:
+    """
+    Like chat_completion for a single user message whose content is the
+    concatenation of `content_chunks`. The request body is streamed, so
+    large documents are never assembled into one prompt string.
+    """
+    payload = {
+        "model": model,
+        "messages": [{"role": "user", "content": CONTENT_PLACEHOLDER}],
+        "temperature": temperature,
+        **options
+    }
+
+    response = get_http_session().post(
+        OPENROUTER_URL,
+        headers=_headers(title),
+        data=_stream_body(payload, content_chunks),
+        timeout=REQUEST_TIMEOUT_S
+    )
+    return _read_completion(response, caller)
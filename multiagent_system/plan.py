@@ -0,0 +1,252 @@
+from json import JSONDecoder
+from typing import Dict, List, Literal, Optional
+
+import orjson
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+from multiagent_system.budget import (
+    DEFAULT_MAX_RESULTS,
+    DEFAULT_SEARCH_DEPTH,
+    MAX_RESULTS_LIMIT,
+    SEARCH_LATENCY_S
+)
+
+MAX_REPAIR_STEPS = 20
+
+
+# ----------------------------
+# Plan Models
+# ----------------------------
+
+class SubQuestion(BaseModel):
+    """
+    One sub-question with its search settings. Out-of-range settings
+    are coerced here rather than rejected, so a slightly off reply is
+    repaired locally instead of costing an LLM retry.
+    """
+    question: str
+    search_depth: Literal["basic", "advanced"] = DEFAULT_SEARCH_DEPTH
+    max_results: int = Field(DEFAULT_MAX_RESULTS, ge=1, le=MAX_RESULTS_LIMIT)
+
+    @field_validator("question", mode="before")
+    @classmethod
+    def _strip_question(cls, value):
+        return str(value).strip() if value is not None else ""
+
+    @field_validator("search_depth", mode="before")
+    @classmethod
+    def _coerce_search_depth(cls, value):
+        value = str(value).strip().lower() if value is not None else ""
+        return value if value in SEARCH_LATENCY_S else DEFAULT_SEARCH_DEPTH
+
+    @field_validator("max_results", mode="before")
+    @classmethod
+    def _clamp_max_results(cls, value):
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            return DEFAULT_MAX_RESULTS
+        return min(max(value, 1), MAX_RESULTS_LIMIT)
+
+
+class ResearchPlan(BaseModel):
+    sub_questions: List[SubQuestion] = Field(min_length=1)
+    output_format: str = ""
+    summary_tokens: Optional[int] = None
+
+    @field_validator("sub_questions", mode="before")
+    @classmethod
+    def _accept_plain_questions(cls, value):
+        # Fixed mode asks for a list of strings. Blank questions are
+        # dropped, so an all-blank plan fails the min_length check.
+        if isinstance(value, list):
+            items = [
+                {"question": item} if isinstance(item, str) else item
+                for item in value
+            ]
+            return [
+                item for item in items
+                if not isinstance(item, dict) or str(item.get("question", "")).strip()
+            ]
+        return value
+
+    @property
+    def questions(self) -> List[str]:
+        return [item.question for item in self.sub_questions]
+
+
+class PlanParseError(RuntimeError):
+    pass
+
+
+# ----------------------------
+# Response Schemas
+# ----------------------------
+
+def plan_response_format(adaptive: bool) -> Dict:
+    """
+    Builds the OpenRouter `response_format` for the planner call.
+    Providers that support structured output return bare JSON matching it.
+    """
+    if adaptive:
+        sub_question_schema = {
+            "type": "object",
+            "properties": {
+                "question": {"type": "string"},
+                "search_depth": {"type": "string", "enum": ["basic", "advanced"]},
+                "max_results": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "maximum": MAX_RESULTS_LIMIT
+                }
+            },
+            "required": ["question", "search_depth", "max_results"],
+            "additionalProperties": False
+        }
+    else:
+        sub_question_schema = {"type": "string"}
+
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "research_plan",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "sub_questions": {
+                        "type": "array",
+                        "items": sub_question_schema
+                    },
+                    "output_format": {"type": "string"}
+                },
+                "required": ["sub_questions", "output_format"],
+                "additionalProperties": False
+            }
+        }
+    }
+
+
+# ----------------------------
+# Parsing
+# ----------------------------
+
+def _strip_code_fence(text: str) -> str:
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text.strip()
+
+
+def _close_open_json(text: str) -> Optional[str]:
+    """
+    Appends the closing brackets for any open arrays/objects.
+    Returns None if the text ends inside a string.
+    """
+    stack = []
+    in_string = False
+    escaped = False
+
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+
+    if in_string:
+        return None
+
+    return text + "".join(reversed(stack))
+
+
+def repair_truncated_json(text: str) -> Optional[Dict]:
+    """
+    Recovers a JSON object from a reply that was cut off mid-way.
+    Cuts back to the last complete element and closes open brackets.
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+
+    candidate = text[start:]
+
+    for _ in range(MAX_REPAIR_STEPS):
+        # A cut right after a separator leaves the last element complete
+        candidate = candidate.rstrip(", \t\r\n")
+
+        closed = _close_open_json(candidate)
+        if closed is not None:
+            try:
+                data = orjson.loads(closed)
+            except orjson.JSONDecodeError:
+                pass
+            else:
+                if isinstance(data, dict):
+                    return data
+
+        cut = max(candidate.rfind(c, 0, len(candidate) - 1) for c in ",[{")
+        if cut <= 0:
+            return None
+
+        candidate = candidate[:cut] if candidate[cut] == "," else candidate[:cut + 1]
+
+    return None
+
+
+def _load_json_object(raw_text: str) -> Optional[Dict]:
+    text = _strip_code_fence(raw_text)
+
+    # Fast path: structured output mode returns the object alone.
+    try:
+        data = orjson.loads(text)
+    except orjson.JSONDecodeError:
+        data = None
+
+    if isinstance(data, dict):
+        return data
+
+    # JSON embedded in prose: decode the first complete object.
+    start = text.find("{")
+    if start != -1:
+        try:
+            data, _ = JSONDecoder().raw_decode(text, start)
+        except ValueError:
+            data = None
+
+        if isinstance(data, dict):
+            return data
+
+    return repair_truncated_json(text)
+
+
+def parse_plan(raw_text: str) -> ResearchPlan:
+    """
+    Parses a planner reply into a ResearchPlan.
+    - Tries the whole reply as JSON first
+    - Falls back to the first JSON object in the text
+    - Repairs truncated JSON locally before giving up
+    """
+    data = _load_json_object(raw_text)
+
+    if data is None:
+        raise PlanParseError(
+            f"Planner did not return valid JSON. Raw output:\n{raw_text}"
+        )
+
+    try:
+        return ResearchPlan.model_validate(data)
+    except ValidationError as e:
+        raise PlanParseError(
+            f"Planner returned an invalid plan: {e}\nRaw output:\n{raw_text}"
+        ) from e
@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass(frozen=True)
+class PipelineProfile:
+    """
+    Settings for one run of the plan → search → write pipeline.
+    - sub_questions / search_depth / max_results: fixed-mode plan shape
+      (adaptive mode sizes the plan from the budget instead)
+    - search_workers: how many sub-questions are searched concurrently
+    - max_refinement_rounds: evaluator re-search rounds, 0 to disable
+    - summary_words / summary_style: writer length and style instructions
+    """
+    name: str
+    model: str
+    sub_questions: int = 3
+    search_depth: str = "basic"
+    max_results: int = 3
+    search_workers: int = 4
+    max_refinement_rounds: int = 2
+    summary_words: Optional[str] = None
+    summary_style: Optional[str] = None
+    title: str = "Multi-Agent Research System"
+
+
+DEFAULT_PROFILE = PipelineProfile(
+    name="default",
+    model="amazon/nova-lite-v1"
+)
+
+# Quick answers: fewer questions, the top result each, a small model
+FAST_PROFILE = PipelineProfile(
+    name="fast",
+    model="amazon/nova-micro-v1",
+    sub_questions=2,
+    max_results=1,
+    max_refinement_rounds=0,
+    summary_words="one concise paragraph of about 150 words",
+    title="Mini Research Agent"
+)
+
+
+def map_concurrently(fn: Callable[[T], R], items: Iterable[T], workers: int) -> List[R]:
+    """
+    Applies `fn` to every item, preserving order.
+    Runs inline when there is at most one worker or one item.
+    """
+    items = list(items)
+
+    if workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as pool:
+        return list(pool.map(fn, items))
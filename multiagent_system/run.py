@@ -1,16 +1,54 @@
-from graph import build_graph
+from concurrent.futures import ThreadPoolExecutor
+
+
+def load_build_graph():
+    from graph import build_graph
+
+    return build_graph
+
+
+def read_latency_budget():
+    """
+    Prompts until the input is blank (fixed mode) or a positive number.
+    """
+    while True:
+        text = input(
+            "Latency budget in seconds (blank for fixed 3-question mode): "
+        ).strip().lower().rstrip("s").strip()
+
+        if not text:
+            return None
+
+        try:
+            latency_s = float(text)
+        except ValueError:
+            latency_s = 0
+
+        if latency_s > 0:
+            return latency_s
+
+        print("Please enter a positive number of seconds, e.g. 30.")
+
 
 def main():
     print("=== Multi-Agent Research System ===\n")
 
-    topic = input("Enter research topic: ")
+    # Import LangGraph and the agents in the background while the user types
+    with ThreadPoolExecutor(max_workers=1) as loader:
+        build_graph_future = loader.submit(load_build_graph)
+
+        topic = input("Enter research topic: ")
+        latency_budget = read_latency_budget()
 
-    graph = build_graph()
+        graph = build_graph_future.result()()
 
     initial_state = {
         "topic": topic
     }
 
+    if latency_budget is not None:
+        initial_state["budget"] = {"latency_s": latency_budget}
+
     result = graph.invoke(initial_state)
 
     print("\n=== Final Research Summary ===\n")
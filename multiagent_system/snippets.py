@@ -0,0 +1,151 @@
+import re
+from typing import Dict, List, Set
+
+import numpy as np
+
+from multiagent_system.sources import SearchResult
+
+# ----------------------------
+# Tokenization
+# ----------------------------
+
+STOPWORDS = {
+    "what", "which", "when", "where", "why", "how", "who", "whom",
+    "does", "do", "did", "is", "are", "was", "were", "be", "been",
+    "the", "and", "for", "with", "from", "into", "about", "that",
+    "this", "these", "those", "their", "there", "have", "has", "can",
+    "could", "would", "should", "will", "its", "any", "some", "more"
+}
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+# Rough tokens-per-word ratio for English text
+TOKENS_PER_WORD = 1.3
+
+SHINGLE_SIZE = 3
+SIMHASH_BITS = 64
+NEAR_DUPLICATE_DISTANCE = 3
+
+HASH_MASK = (1 << SIMHASH_BITS) - 1
+
+
+def words(text: str) -> List[str]:
+    return WORD_PATTERN.findall(text.lower())
+
+
+def key_terms(text: str) -> Set[str]:
+    return {w for w in words(text) if len(w) > 2 and w not in STOPWORDS}
+
+
+def estimate_tokens(text: str) -> int:
+    return int(len(text.split()) * TOKENS_PER_WORD)
+
+
+# ----------------------------
+# Near-Duplicate Detection
+# ----------------------------
+
+def simhash_fingerprints(texts: List[str]) -> np.ndarray:
+    """
+    Computes a 64-bit SimHash per text over word shingles.
+    Bit voting is done with numpy across all shingles of a text at once.
+    """
+    fingerprints = np.zeros(len(texts), dtype=np.uint64)
+
+    for i, text in enumerate(texts):
+        tokens = words(text)
+        shingles = [
+            " ".join(tokens[j:j + SHINGLE_SIZE])
+            for j in range(max(len(tokens) - SHINGLE_SIZE + 1, 1))
+        ]
+        hashes = np.array(
+            [hash(shingle) & HASH_MASK for shingle in shingles],
+            dtype=np.uint64
+        )
+        bits = np.unpackbits(hashes.view(np.uint8)).reshape(-1, SIMHASH_BITS)
+        votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(shingles)
+        packed = np.packbits(votes > 0)
+        fingerprints[i] = packed.view(np.uint64)[0]
+
+    return fingerprints
+
+
+def near_duplicate_mask(texts: List[str]) -> np.ndarray:
+    """
+    Returns a boolean mask that is True for texts that nearly duplicate
+    an earlier text (SimHash Hamming distance within the threshold).
+    """
+    if not texts:
+        return np.zeros(0, dtype=bool)
+
+    fingerprints = simhash_fingerprints(texts)
+    distances = np.bitwise_count(fingerprints[:, None] ^ fingerprints[None, :])
+
+    close = distances <= NEAR_DUPLICATE_DISTANCE
+    earlier = np.tril(close, k=-1)
+    return earlier.any(axis=1)
+
+
+# ----------------------------
+# Snippet Compression
+# ----------------------------
+
+def _sentence_key(sentence: str) -> str:
+    return " ".join(words(sentence))
+
+
+def compress_snippets(question: str, results: List[Dict], token_cap: int) -> List[SearchResult]:
+    """
+    Deduplicates and compresses Tavily results for one question.
+    - Drops near-duplicate snippets (SimHash over shingles)
+    - Drops sentences already seen in an earlier snippet
+    - Keeps the most question-relevant sentences up to the token cap,
+      in their original order
+    Each returned SearchResult keeps its url, title and score for citation.
+    """
+    results = [r for r in results if r.get("content")]
+    duplicates = near_duplicate_mask([r["content"] for r in results])
+
+    terms = key_terms(question)
+    seen = set()
+    candidates = []
+
+    for source_index, result in enumerate(results):
+        if duplicates[source_index]:
+            continue
+
+        for position, sentence in enumerate(SENTENCE_PATTERN.split(result["content"])):
+            sentence = sentence.strip()
+            key = _sentence_key(sentence)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+
+            overlap = len(terms & set(key.split())) / len(terms) if terms else 0.0
+            relevance = overlap + 1.0 / (position + 2)
+            candidates.append((relevance, source_index, position, sentence))
+
+    kept = []
+    used_tokens = 0
+
+    for candidate in sorted(candidates, key=lambda c: c[0], reverse=True):
+        tokens = estimate_tokens(candidate[3])
+        if kept and used_tokens + tokens > token_cap:
+            continue
+        kept.append(candidate)
+        used_tokens += tokens
+
+    sentences_by_source = {}
+    for _, source_index, position, sentence in sorted(kept, key=lambda c: (c[1], c[2])):
+        sentences_by_source.setdefault(source_index, []).append(sentence)
+
+    return [
+        SearchResult(
+            url=results[source_index].get("url", ""),
+            title=results[source_index].get("title", ""),
+            score=results[source_index].get("score", 0.0),
+            snippet=" ".join(sentences)
+        )
+        for source_index, sentences in sentences_by_source.items()
+    ]
@@ -0,0 +1,73 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+CITATION_PATTERN = re.compile(r"\[(\d+)\]")
+
+
+@dataclass(frozen=True, slots=True)
+class SearchResult:
+    url: str
+    title: str
+    score: float
+    snippet: str
+
+
+def number_sources(search_results: Dict[str, List[SearchResult]]) -> Tuple[str, List[SearchResult]]:
+    """
+    Assigns one number per unique URL, in order of first appearance.
+    Returns the findings text with numbered snippets and the source list
+    (source n is at index n - 1).
+    """
+    numbers = {}
+    sources = []
+    sections = []
+
+    for question, results in search_results.items():
+        lines = [f"Sub-question: {question}"]
+
+        for result in results:
+            key = result.url or result.snippet
+            if key not in numbers:
+                sources.append(result)
+                numbers[key] = len(sources)
+            lines.append(f"[{numbers[key]}] {result.snippet}")
+
+        if not results:
+            lines.append("No relevant results found.")
+
+        sections.append("\n".join(lines))
+
+    return "\n\n".join(sections), sources
+
+
+def format_source_list(sources: List[SearchResult]) -> str:
+    return "\n".join(
+        f"[{n}] {source.title or source.url} — {source.url}"
+        for n, source in enumerate(sources, start=1)
+    )
+
+
+def format_references(summary: str, sources: List[SearchResult]) -> str:
+    """
+    Builds a References section with resolved links for the sources the
+    summary cites. Falls back to every source if none are cited.
+    """
+    cited = sorted({
+        int(n) for n in CITATION_PATTERN.findall(summary)
+        if 1 <= int(n) <= len(sources)
+    })
+
+    if not cited:
+        cited = list(range(1, len(sources) + 1))
+
+    if not cited:
+        return ""
+
+    lines = []
+    for n in cited:
+        source = sources[n - 1]
+        title = source.title or source.url
+        lines.append(f"[{n}] [{title}]({source.url})" if source.url else f"[{n}] {title}")
+
+    return "References\n\n" + "\n\n".join(lines)
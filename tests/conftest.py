@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Add project root to PYTHONPATH so the packages import without installing
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+
+from interactive_assistant.jobs import (
+    CANCELLED,
+    DONE,
+    JobQueue,
+    JobQueueFull
+)
+
+
+def blocking_job(release: threading.Event, started: threading.Event = None):
+    def run(job):
+        if started is not None:
+            started.set()
+        release.wait(5)
+        job.check()
+        return "result"
+    return run
+
+
+def test_cancelled_queued_job_frees_its_slot():
+    release, started = threading.Event(), threading.Event()
+    jobs = JobQueue(workers=1, max_pending=2)
+
+    running = jobs.submit(blocking_job(release, started))
+    assert started.wait(5)
+
+    first = jobs.submit(blocking_job(release))
+    jobs.submit(blocking_job(release))
+    with pytest.raises(JobQueueFull):
+        jobs.submit(blocking_job(release))
+
+    first.cancel()
+    assert first.status == CANCELLED
+    assert jobs.stats()["pending"] == 1
+
+    replacement = jobs.submit(blocking_job(release))
+
+    release.set()
+    assert running.wait(5) and replacement.wait(5)
+    assert replacement.status == DONE
+    assert first.status == CANCELLED
+
+
+def test_coalesced_cancel_counts_once_per_caller():
+    release, started = threading.Event(), threading.Event()
+    jobs = JobQueue(workers=1)
+
+    mine = jobs.submit(blocking_job(release, started), key="same")
+    theirs = jobs.submit(blocking_job(release), key="same")
+    assert mine.job is theirs.job
+    assert started.wait(5)
+
+    # Repeated clicks from one caller must not cancel the other's job
+    mine.cancel()
+    mine.cancel()
+
+    release.set()
+    assert theirs.wait(5)
+    assert theirs.status == DONE
+    assert theirs.result == "result"
+
+
+def test_job_runs_on_until_every_caller_cancels():
+    release, started = threading.Event(), threading.Event()
+    jobs = JobQueue(workers=1)
+
+    mine = jobs.submit(blocking_job(release, started), key="same")
+    theirs = jobs.submit(blocking_job(release), key="same")
+    assert started.wait(5)
+
+    mine.cancel()
+    theirs.cancel()
+
+    release.set()
+    assert mine.wait(5)
+    assert mine.status == CANCELLED
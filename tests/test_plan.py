@@ -0,0 +1,79 @@
+import pytest
+
+from multiagent_system.budget import (
+    DEFAULT_MAX_RESULTS,
+    MAX_RESULTS_LIMIT,
+    MAX_SUB_QUESTIONS,
+    fit_plan_to_budget
+)
+from multiagent_system.plan import (
+    PlanParseError,
+    ResearchPlan,
+    parse_plan,
+    repair_truncated_json
+)
+
+
+@pytest.mark.parametrize("text, expected", [
+    (
+        '{"sub_questions": ["q1", "q2", ',
+        {"sub_questions": ["q1", "q2"]}
+    ),
+    (
+        '{"sub_questions": ["q1", "q2"',
+        {"sub_questions": ["q1", "q2"]}
+    ),
+    (
+        '{"sub_questions": [{"question": "a"}, {"question": "b"},',
+        {"sub_questions": [{"question": "a"}, {"question": "b"}]}
+    ),
+    (
+        '{"sub_questions": [{"question": "a"}, {"question": "b", "search_de',
+        {"sub_questions": [{"question": "a"}, {"question": "b"}]}
+    ),
+    (
+        '{"sub_questions": ["q1", "q2"], "output_format": "Short summ',
+        {"sub_questions": ["q1", "q2"]}
+    ),
+])
+def test_repair_keeps_complete_elements(text, expected):
+    assert repair_truncated_json(text) == expected
+
+
+def test_repair_without_object_returns_none():
+    assert repair_truncated_json('["q1", "q2"') is None
+
+
+def test_out_of_range_settings_are_clamped_not_rejected():
+    plan = parse_plan(
+        '{"sub_questions": ['
+        '{"question": " q1 ", "search_depth": "Advanced", "max_results": 50},'
+        '{"question": "q2", "search_depth": "deep", "max_results": "two"},'
+        '{"question": "  ", "search_depth": "basic", "max_results": 1}'
+        '], "output_format": "x"}'
+    )
+
+    assert [(item.question, item.search_depth, item.max_results) for item in plan.sub_questions] == [
+        ("q1", "advanced", MAX_RESULTS_LIMIT),
+        ("q2", "basic", DEFAULT_MAX_RESULTS)
+    ]
+
+
+def test_all_blank_plan_is_a_parse_error():
+    with pytest.raises(PlanParseError):
+        parse_plan('{"sub_questions": ["", "  "], "output_format": "x"}')
+
+
+def test_fit_plan_to_budget_keeps_typed_plan():
+    plan = parse_plan(
+        '{"sub_questions": ['
+        + ",".join('{"question": "q%d", "search_depth": "advanced", "max_results": 10}' % i for i in range(8))
+        + '], "output_format": "x"}'
+    )
+
+    fitted = fit_plan_to_budget(plan, {"latency_s": 20, "max_tokens": 2000})
+
+    assert isinstance(fitted, ResearchPlan)
+    assert 1 <= len(fitted.sub_questions) <= MAX_SUB_QUESTIONS
+    assert fitted.summary_tokens is not None
+    assert plan.sub_questions[0].max_results == 10